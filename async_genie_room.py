@@ -0,0 +1,251 @@
+import asyncio
+import random
+import weakref
+import pandas as pd
+from typing import Dict, Any, Optional, List, Union, Tuple
+import logging
+import aiohttp
+import orjson
+import backoff
+from genie_room import _get_config, _get_token_minter, process_genie_response
+
+logger = logging.getLogger(__name__)
+
+# One ClientSession per event loop, created lazily on first use. aiohttp
+# sessions are bound to the loop they were created on, so a plain
+# module-level session would break under multiple loops, and a ContextVar
+# can't share one across gathered tasks (each task gets its own context
+# copy). Weak keys let a loop's entry disappear with the loop itself.
+_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+async def _get_session() -> aiohttp.ClientSession:
+    """Get the shared aiohttp session for the running loop, creating it on first use"""
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=100, limit_per_host=20, keepalive_timeout=75)
+        )
+        _sessions[loop] = session
+    return session
+
+
+# Same retry policy as the sync GenieClient: transient transport failures
+# and 429/5xx responses are retried, other 4xx give up immediately
+_api_retry = backoff.on_exception(
+    backoff.expo,
+    (aiohttp.ClientError, asyncio.TimeoutError),
+    max_tries=5,
+    max_time=30,
+    factor=2,
+    jitter=backoff.full_jitter,
+    giveup=lambda e: (
+        isinstance(e, aiohttp.ClientResponseError)
+        and 400 <= e.status < 500
+        and e.status != 429
+    ),
+    on_backoff=lambda details: logger.warning(
+        f"API request failed. Retrying in {details['wait']:.2f} seconds (attempt {details['tries']})"
+    )
+)
+
+
+class AsyncGenieClient:
+    """Async counterpart of GenieClient using a shared aiohttp session"""
+
+    def __init__(self, host: str, space_id: str):
+        self.host = host
+        self.space_id = space_id
+        self.base_url = f"https://{host}/api/2.0/genie/spaces/{space_id}"
+
+    def _headers(self) -> Dict[str, str]:
+        """Build request headers with a fresh token from token_minter"""
+        return {
+            "Authorization": f"Bearer {_get_token_minter().get_token()}",
+            "Content-Type": "application/json"
+        }
+
+    @_api_retry
+    async def start_conversation(self, question: str) -> Dict[str, Any]:
+        """Start a new conversation with the given question"""
+        session = await _get_session()
+        url = f"{self.base_url}/start-conversation"
+        async with session.post(url, json={"content": question}, headers=self._headers()) as r:
+            r.raise_for_status()
+            return await r.json(loads=orjson.loads)
+
+    @_api_retry
+    async def send_message(self, conversation_id: str, message: str) -> Dict[str, Any]:
+        """Send a follow-up message to an existing conversation"""
+        session = await _get_session()
+        url = f"{self.base_url}/conversations/{conversation_id}/messages"
+        async with session.post(url, json={"content": message}, headers=self._headers()) as r:
+            r.raise_for_status()
+            return await r.json(loads=orjson.loads)
+
+    @_api_retry
+    async def get_message(self, conversation_id: str, message_id: str) -> Dict[str, Any]:
+        """Get the details of a specific message"""
+        session = await _get_session()
+        url = f"{self.base_url}/conversations/{conversation_id}/messages/{message_id}"
+        async with session.get(url, headers=self._headers()) as r:
+            r.raise_for_status()
+            return await r.json(loads=orjson.loads)
+
+    @_api_retry
+    async def list_conversation_messages(self, conversation_id: str) -> Dict[str, Any]:
+        """List all messages in a conversation with full details"""
+        session = await _get_session()
+        url = f"{self.base_url}/conversations/{conversation_id}/messages"
+        async with session.get(url, headers=self._headers()) as r:
+            r.raise_for_status()
+            return await r.json(loads=orjson.loads)
+
+    @_api_retry
+    async def get_query_result(self, conversation_id: str, message_id: str, attachment_id: str) -> Dict[str, Any]:
+        """Get the query result using the attachment_id endpoint"""
+        session = await _get_session()
+        url = f"{self.base_url}/conversations/{conversation_id}/messages/{message_id}/attachments/{attachment_id}/query-result"
+        async with session.get(url, headers=self._headers()) as r:
+            r.raise_for_status()
+            result = await r.json(loads=orjson.loads)
+
+        data_array = []
+        if 'statement_response' in result:
+            if 'result' in result['statement_response']:
+                data_array = result['statement_response']['result'].get('data_array', [])
+
+        return {
+                    'data_array': data_array,
+                    'schema': result.get('statement_response', {}).get('manifest', {}).get('schema', {})
+                }
+
+    @_api_retry
+    async def execute_query(self, conversation_id: str, message_id: str, attachment_id: str) -> Dict[str, Any]:
+        """Execute a query using the attachment_id endpoint"""
+        session = await _get_session()
+        url = f"{self.base_url}/conversations/{conversation_id}/messages/{message_id}/attachments/{attachment_id}/execute-query"
+        async with session.post(url, headers=self._headers()) as r:
+            r.raise_for_status()
+            return await r.json(loads=orjson.loads)
+
+    async def wait_for_message_completion(self, conversation_id: str, message_id: str, timeout: int = 300, initial_poll: float = 1.0, max_poll: float = 8.0) -> Dict[str, Any]:
+        """
+        Wait for a message to reach a terminal state (COMPLETED, ERROR, etc.)
+        without blocking the event loop between polls. Uses the same
+        exponentially increasing, jittered interval as the sync client.
+        """
+        loop = asyncio.get_event_loop()
+        start_time = loop.time()
+        interval = initial_poll
+
+        while loop.time() - start_time < timeout:
+            message = await self.get_message(conversation_id, message_id)
+            status = message.get("status")
+
+            if status in ["COMPLETED", "ERROR", "FAILED"]:
+                return message
+
+            await asyncio.sleep(interval + random.uniform(0, interval * 0.2))
+            interval = min(interval * 1.5, max_poll)
+
+        raise TimeoutError(f"Message processing timed out after {timeout} seconds")
+
+
+class _SyncClientAdapter:
+    """
+    Adapts an AsyncGenieClient so the sync process_genie_response helper can
+    call get_query_result from within a running event loop.
+    """
+    def __init__(self, aclient: AsyncGenieClient, loop: asyncio.AbstractEventLoop):
+        self._aclient = aclient
+        self._loop = loop
+
+    def get_query_result(self, conversation_id: str, message_id: str, attachment_id: str) -> Dict[str, Any]:
+        future = asyncio.run_coroutine_threadsafe(
+            self._aclient.get_query_result(conversation_id, message_id, attachment_id),
+            self._loop
+        )
+        return future.result()
+
+
+async def agenie_query(question: str) -> Tuple[Union[str, pd.DataFrame], Optional[str], List[str], Optional[str], Optional[str]]:
+    """
+    Async entry point for querying Genie. Mirrors genie_room.genie_query so
+    callers can fan out multiple questions with asyncio.gather(...).
+
+    Args:
+        question: The question to ask
+
+    Returns:
+        Same tuple as genie_room.genie_query:
+        (response, query_text, suggested_questions, conversation_id, message_id)
+    """
+    config = _get_config()
+    client = AsyncGenieClient(
+        host=config["host"],
+        space_id=config["space_id"]
+    )
+
+    try:
+        response = await client.start_conversation(question)
+        conversation_id = response.get("conversation_id")
+        message_id = response.get("message_id")
+
+        complete_message = await client.wait_for_message_completion(conversation_id, message_id)
+
+        # The completed message already carries the bot's attachments and
+        # suggested_questions; only fall back to the list endpoint when it
+        # came back with neither
+        full_message = complete_message
+        if not complete_message.get("attachments") and not complete_message.get("content"):
+            messages_response = await client.list_conversation_messages(conversation_id)
+            messages = messages_response.get("messages", [])
+
+            for i, msg in enumerate(messages):
+                if msg.get("message_id") == message_id:
+                    if i + 1 < len(messages):
+                        full_message = messages[i + 1]
+                    break
+            else:
+                if messages:
+                    full_message = messages[-1]
+
+        bot_message_id = full_message.get("message_id") or full_message.get("id") or message_id
+
+        # Reuse the sync response processing; query-result fetches run through
+        # the adapter in a worker thread so the loop keeps servicing them
+        loop = asyncio.get_event_loop()
+        adapter = _SyncClientAdapter(client, loop)
+        result, query_text, suggested_questions = await asyncio.to_thread(
+            process_genie_response, adapter, conversation_id, message_id, full_message
+        )
+
+        return result, query_text, suggested_questions, conversation_id, bot_message_id
+
+    except Exception as e:
+        logger.error(f"Error in conversation: {str(e)}. Please try again.")
+        return f"Sorry, an error occurred: {str(e)}. Please try again.", None, [], None, None
+
+
+async def _query_then_close_session(question: str) -> Tuple[Union[str, pd.DataFrame], Optional[str], List[str], Optional[str], Optional[str]]:
+    """
+    Run agenie_query and close the session it created before the loop dies.
+
+    asyncio.run tears down its loop when it returns, so a session left
+    open here would leak its sockets rather than be reused by the next call.
+    """
+    try:
+        return await agenie_query(question)
+    finally:
+        session = _sessions.get(asyncio.get_running_loop())
+        if session is not None and not session.closed:
+            await session.close()
+
+
+def genie_query(question: str) -> Tuple[Union[str, pd.DataFrame], Optional[str], List[str], Optional[str], Optional[str]]:
+    """Sync wrapper around agenie_query for callers without an event loop"""
+    return asyncio.run(_query_then_close_session(question))
@@ -1,198 +1,358 @@
+import cachetools
+import concurrent.futures
+import functools
 import pandas as pd
 import time
-import requests
+import httpx
 import os
-import json
+import ijson
+import orjson
 from dotenv import load_dotenv
 from typing import Dict, Any, Optional, List, Union, Tuple
 import logging
 import backoff
+import random
 import uuid
 from token_minter import TokenMinter
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-load_dotenv()
 
-# Load environment variables
-SPACE_ID = os.environ.get("SPACE_ID")
-DATABRICKS_HOST = os.environ.get("DATABRICKS_HOST")
-CLIENT_ID = os.environ.get("DATABRICKS_CLIENT_ID")
-CLIENT_SECRET = os.environ.get("DATABRICKS_CLIENT_SECRET")
+@functools.lru_cache(maxsize=1)
+def _get_config() -> Dict[str, Optional[str]]:
+    """Load environment configuration on first use instead of at import time"""
+    load_dotenv()
+    return {
+        "space_id": os.environ.get("SPACE_ID"),
+        "host": os.environ.get("DATABRICKS_HOST"),
+        "client_id": os.environ.get("DATABRICKS_CLIENT_ID"),
+        "client_secret": os.environ.get("DATABRICKS_CLIENT_SECRET"),
+    }
 
-token_minter = TokenMinter(
-    client_id=CLIENT_ID,
-    client_secret=CLIENT_SECRET,
-    host=DATABRICKS_HOST
+
+@functools.lru_cache(maxsize=1)
+def _get_token_minter() -> TokenMinter:
+    """
+    Construct the shared TokenMinter on first use. Its constructor mints a
+    token over the network, so merely importing this module stays free.
+    """
+    config = _get_config()
+    return TokenMinter(
+        client_id=config["client_id"],
+        client_secret=config["client_secret"],
+        host=config["host"]
+    )
+
+
+def _log_backoff(details) -> None:
+    logger.warning(
+        f"API request failed. Retrying in {details['wait']:.2f} seconds (attempt {details['tries']})"
+    )
+
+def _giveup_on_client_error(e: Exception) -> bool:
+    """
+    Give up immediately on 4xx responses other than 401 and 429 - retrying
+    won't help. 401 stays retryable because _check_response invalidates the
+    cached token, so the retry runs with a freshly minted one.
+    """
+    return (
+        isinstance(e, httpx.HTTPStatusError)
+        and 400 <= e.response.status_code < 500
+        and e.response.status_code not in (401, 429)
+    )
+
+def _giveup_on_http_error(e: Exception) -> bool:
+    """
+    Give up on any HTTP error response except 401 and 429 (used for
+    non-idempotent POSTs); an errored request was never processed, so a
+    retry with a fresh token or after the rate-limit window can't
+    double-submit.
+    """
+    return (
+        isinstance(e, httpx.HTTPStatusError)
+        and e.response.status_code not in (401, 429)
+    )
+
+# Idempotent GETs: retry transient transport failures plus 429/5xx responses
+_retry_get = backoff.on_exception(
+    backoff.expo,
+    (httpx.TransportError, httpx.HTTPStatusError),
+    max_tries=5,
+    max_time=30,
+    factor=2,
+    jitter=backoff.full_jitter,
+    giveup=_giveup_on_client_error,
+    on_backoff=_log_backoff
+)
+
+# Non-idempotent POSTs: the server may have processed the request before the
+# failure, so only retry transport errors and 429 - never other HTTP errors,
+# which could double-submit conversations
+_retry_post = backoff.on_exception(
+    backoff.expo,
+    (httpx.TransportError, httpx.HTTPStatusError),
+    max_tries=5,
+    max_time=30,
+    factor=2,
+    jitter=backoff.full_jitter,
+    giveup=_giveup_on_http_error,
+    on_backoff=_log_backoff
 )
 
 
+class _ResponseStream:
+    """
+    Minimal file-like wrapper over an iterator of bytes chunks.
+
+    ijson only accepts bytes/str or a file-like source - handing it a raw
+    chunk iterator makes it treat the chunks as a pre-parsed event stream -
+    so this adapts a streamed httpx response to the read() interface.
+    """
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self._buffer = b""
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            parts = [self._buffer]
+            parts.extend(self._chunks)
+            self._buffer = b""
+            return b"".join(parts)
+        while len(self._buffer) < size:
+            try:
+                self._buffer += next(self._chunks)
+            except StopIteration:
+                break
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+# JSON paths inside a query-result body that _parse_query_result_stream extracts
+_ROW_PREFIX = 'statement_response.result.data_array.item'
+_SCHEMA_PREFIX = 'statement_response.manifest.schema'
+
+def _parse_query_result_stream(stream) -> Tuple[List[List[Any]], Dict[str, Any]]:
+    """
+    Incrementally parse a query-result body from a file-like stream.
+
+    Decodes data_array rows and the manifest schema in a single pass as bytes
+    arrive, so the raw body and the fully decoded object tree are never held
+    in memory together - on multi-MB result sets this roughly halves peak
+    memory and overlaps network transfer with parsing.
+    """
+    data_array: List[List[Any]] = []
+    schema: Dict[str, Any] = {}
+    builder = None
+    builder_prefix = None
+
+    for prefix, event, value in ijson.parse(stream):
+        if builder is not None:
+            builder.event(event, value)
+            if prefix == builder_prefix and event in ('end_array', 'end_map'):
+                if builder_prefix == _ROW_PREFIX:
+                    data_array.append(builder.value)
+                else:
+                    schema = builder.value
+                builder = None
+        elif prefix == _ROW_PREFIX and event == 'start_array':
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+            builder_prefix = _ROW_PREFIX
+        elif prefix == _SCHEMA_PREFIX and event == 'start_map':
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+            builder_prefix = _SCHEMA_PREFIX
+
+    return data_array, schema
+
+
 class GenieClient:
+    # How long a cached space-details response stays fresh, in seconds
+    SPACE_CACHE_TTL = 300.0
+
+    # Longest we're willing to honor a server-provided Retry-After hint, in seconds
+    MAX_RETRY_AFTER = 30.0
+
+    # Correct format: {"rating": "POSITIVE"} or {"rating": "NEGATIVE"}
+    _RATINGS = {"positive": "POSITIVE", "negative": "NEGATIVE"}
+
     def __init__(self, host: str, space_id: str):
         self.host = host
         self.space_id = space_id
+
+        # Cache for get_space_details: the parsed response, the ETag it was
+        # served with, and when the cache goes stale
+        self._space_cache: Optional[Dict[str, Any]] = None
+        self._space_etag: Optional[str] = None
+        self._space_expiry: float = 0.0
+
+        # One pooled HTTP/2 client for all calls: every request hits the same
+        # Databricks host, so requests multiplex over a single kept-alive TLS
+        # connection instead of paying a handshake (or a whole connection) each
+        self.client = httpx.Client(
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            timeout=30.0
+        )
+        self.client.headers["Content-Type"] = "application/json"
+        self._last_token: Optional[str] = None
         self.update_headers()
-        
+
         self.base_url = f"https://{host}/api/2.0/genie/spaces/{space_id}"
-    
+
+        # Precompute the constant URL pieces so hot-path calls (notably the
+        # get_message poll loop) only concatenate the variable IDs
+        self._start_conversation_url = self.base_url + "/start-conversation"
+        self._conversations_url = self.base_url + "/conversations/"
+
     def update_headers(self) -> None:
-        """Update headers with fresh token from token_minter"""
-        self.headers = {
-            "Authorization": f"Bearer {token_minter.get_token()}",
-            "Content-Type": "application/json"
-        }
+        """Update the client's Authorization header, but only when the cached token rotates"""
+        token = _get_token_minter().get_token()
+        if token != self._last_token:
+            self._last_token = token
+            self.client.headers["Authorization"] = f"Bearer {token}"
+
+    def _check_response(self, response: httpx.Response) -> None:
+        """
+        Check a response, passing 2xx straight through via response.is_success.
+
+        A 401 invalidates the cached token so the retry mints a fresh one.
+        A 429 honors the server's Retry-After hint (capped at
+        MAX_RETRY_AFTER) before raising, so the backoff retry fires when the
+        server says it may rather than on its own exponential schedule.
+        """
+        if response.is_success:
+            return
+
+        if response.status_code == 401:
+            _get_token_minter().invalidate()
+            self._last_token = None
+        elif response.status_code == 429:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    delay = min(float(retry_after), self.MAX_RETRY_AFTER)
+                except ValueError:
+                    delay = 0.0
+                if delay > 0:
+                    logger.warning("Rate limited; honoring Retry-After of %.1fs", delay)
+                    time.sleep(delay)
+
+        response.raise_for_status()
     
-    @backoff.on_exception(
-        backoff.expo,
-        Exception,  
-        max_tries=5,
-        factor=2,
-        jitter=backoff.full_jitter,
-        on_backoff=lambda details: logger.warning(
-            f"API request failed. Retrying in {details['wait']:.2f} seconds (attempt {details['tries']})"
-        )
-    )
+    @_retry_post
     def start_conversation(self, question: str) -> Dict[str, Any]:
         """Start a new conversation with the given question"""
-        self.update_headers()  # Refresh token before API call
-        url = f"{self.base_url}/start-conversation"
+        self.update_headers()  # No-op unless the cached token rotated
+        url = self._start_conversation_url
         payload = {"content": question}
         
-        response = requests.post(url, headers=self.headers, json=payload)
-        response.raise_for_status()
-        return response.json()
+        response = self.client.post(url, content=orjson.dumps(payload))
+        self._check_response(response)
+        return orjson.loads(response.content)
     
-    @backoff.on_exception(
-        backoff.expo,
-        Exception,  # Retry on any exception
-        max_tries=5,
-        factor=2,
-        jitter=backoff.full_jitter,
-        on_backoff=lambda details: logger.warning(
-            f"API request failed. Retrying in {details['wait']:.2f} seconds (attempt {details['tries']})"
-        )
-    )
+    @_retry_post
     def send_message(self, conversation_id: str, message: str) -> Dict[str, Any]:
         """Send a follow-up message to an existing conversation"""
-        self.update_headers()  # Refresh token before API call
-        url = f"{self.base_url}/conversations/{conversation_id}/messages"
+        self.update_headers()  # No-op unless the cached token rotated
+        url = self._conversations_url + conversation_id + "/messages"
         payload = {"content": message}
         
-        response = requests.post(url, headers=self.headers, json=payload)
-        response.raise_for_status()
-        return response.json()
-
-    @backoff.on_exception(
-        backoff.expo,
-        Exception,  # Retry on any exception
-        max_tries=5,
-        factor=2,
-        jitter=backoff.full_jitter,
-        on_backoff=lambda details: logger.warning(
-            f"API request failed. Retrying in {details['wait']:.2f} seconds (attempt {details['tries']})"
-        )
-    )
+        response = self.client.post(url, content=orjson.dumps(payload))
+        self._check_response(response)
+        return orjson.loads(response.content)
+
+    @_retry_get
     def get_message(self, conversation_id: str, message_id: str) -> Dict[str, Any]:
         """Get the details of a specific message"""
-        self.update_headers()  # Refresh token before API call
-        url = f"{self.base_url}/conversations/{conversation_id}/messages/{message_id}"
+        self.update_headers()  # No-op unless the cached token rotated
+        url = self._conversations_url + conversation_id + "/messages/" + message_id
         
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
-        return response.json()
-
-    @backoff.on_exception(
-        backoff.expo,
-        Exception,  # Retry on any exception
-        max_tries=5,
-        factor=2,
-        jitter=backoff.full_jitter,
-        on_backoff=lambda details: logger.warning(
-            f"API request failed. Retrying in {details['wait']:.2f} seconds (attempt {details['tries']})"
-        )
-    )
+        response = self.client.get(url)
+        self._check_response(response)
+        return orjson.loads(response.content)
+
+    @_retry_get
     def list_conversation_messages(self, conversation_id: str) -> Dict[str, Any]:
         """
         List all messages in a conversation with full details including suggested_questions.
         This endpoint returns more complete information than get_message.
         """
-        self.update_headers()  # Refresh token before API call
-        url = f"{self.base_url}/conversations/{conversation_id}/messages"
+        self.update_headers()  # No-op unless the cached token rotated
+        url = self._conversations_url + conversation_id + "/messages"
         
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
-        return response.json()
-
-    @backoff.on_exception(
-        backoff.expo,
-        Exception,  # Retry on any exception
-        max_tries=5,
-        factor=2,
-        jitter=backoff.full_jitter,
-        on_backoff=lambda details: logger.warning(
-            f"API request failed. Retrying in {details['wait']:.2f} seconds (attempt {details['tries']})"
-        )
-    )
+        response = self.client.get(url)
+        self._check_response(response)
+        return orjson.loads(response.content)
+
+    @_retry_get
     def get_query_result(self, conversation_id: str, message_id: str, attachment_id: str) -> Dict[str, Any]:
         """Get the query result using the attachment_id endpoint"""
-        self.update_headers()  # Refresh token before API call
-        url = f"{self.base_url}/conversations/{conversation_id}/messages/{message_id}/attachments/{attachment_id}/query-result"
-        
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
-        result = response.json()
-        
-        # Extract data_array from the correct nested location
-        data_array = []
-        if 'statement_response' in result:
-            if 'result' in result['statement_response']:
-                data_array = result['statement_response']['result'].get('data_array', [])
-            
+        self.update_headers()  # No-op unless the cached token rotated
+        url = self._conversations_url + conversation_id + "/messages/" + message_id + "/attachments/" + attachment_id + "/query-result"
+        
+        # Stream-parse the body: data_array rows and the schema are decoded
+        # incrementally off the wire instead of buffering the full payload
+        with self.client.stream("GET", url) as response:
+            self._check_response(response)
+            data_array, schema = _parse_query_result_stream(_ResponseStream(response.iter_bytes()))
+
         return {
                     'data_array': data_array,
-                    'schema': result.get('statement_response', {}).get('manifest', {}).get('schema', {})
+                    'schema': schema
                 }
 
-    @backoff.on_exception(
-        backoff.expo,
-        Exception,  # Retry on any exception
-        max_tries=5,
-        factor=2,
-        jitter=backoff.full_jitter,
-        on_backoff=lambda details: logger.warning(
-            f"API request failed. Retrying in {details['wait']:.2f} seconds (attempt {details['tries']})"
-        )
-    )
+    @_retry_post
     def execute_query(self, conversation_id: str, message_id: str, attachment_id: str) -> Dict[str, Any]:
         """Execute a query using the attachment_id endpoint"""
-        self.update_headers()  # Refresh token before API call
-        url = f"{self.base_url}/conversations/{conversation_id}/messages/{message_id}/attachments/{attachment_id}/execute-query"
+        self.update_headers()  # No-op unless the cached token rotated
+        url = self._conversations_url + conversation_id + "/messages/" + message_id + "/attachments/" + attachment_id + "/execute-query"
         
-        response = requests.post(url, headers=self.headers)
-        response.raise_for_status()
-        return response.json()
+        response = self.client.post(url)
+        self._check_response(response)
+        return orjson.loads(response.content)
     
-    @backoff.on_exception(
-        backoff.expo,
-        Exception,
-        max_tries=5,
-        factor=2,
-        jitter=backoff.full_jitter,
-        on_backoff=lambda details: logger.warning(
-            f"API request failed. Retrying in {details['wait']:.2f} seconds (attempt {details['tries']})"
-        )
-    )
+    @_retry_get
     def get_space_details(self) -> Dict[str, Any]:
-        """Get the Genie Space details including sample questions"""
-        self.update_headers()  # Refresh token before API call
+        """
+        Get the Genie Space details including sample questions.
+
+        The response is cached for SPACE_CACHE_TTL seconds since space config
+        rarely changes, with the serialized_space string parsed once and
+        exposed as 'serialized_space_obj'. When the cache is stale, the stored
+        ETag is sent as If-None-Match so an unchanged space skips both the
+        body transfer and the re-parse.
+        """
+        now = time.monotonic()
+        if self._space_cache is not None and now < self._space_expiry:
+            return self._space_cache
+
+        self.update_headers()  # No-op unless the cached token rotated
         url = f"https://{self.host}/api/2.0/genie/spaces/{self.space_id}"
-        
+
         # Add query parameter to include serialized space data
         params = {"include_serialized_space": "true"}
-        
-        response = requests.get(url, headers=self.headers, params=params)
-        response.raise_for_status()
-        return response.json()
+        headers = {"If-None-Match": self._space_etag} if self._space_etag else None
+
+        response = self.client.get(url, params=params, headers=headers or {})
+        if response.status_code == 304 and self._space_cache is not None:
+            self._space_expiry = now + self.SPACE_CACHE_TTL
+            return self._space_cache
+        self._check_response(response)
+        space_details = orjson.loads(response.content)
+
+        # Parse serialized_space once so callers don't each re-run json.loads
+        serialized_space = space_details.get('serialized_space')
+        if serialized_space:
+            try:
+                space_details['serialized_space_obj'] = orjson.loads(serialized_space)
+            except orjson.JSONDecodeError as e:
+                logger.error(f"Error parsing serialized_space JSON: {str(e)}")
+
+        self._space_cache = space_details
+        self._space_etag = response.headers.get("ETag")
+        self._space_expiry = now + self.SPACE_CACHE_TTL
+        return space_details
     
     def send_message_feedback(self, conversation_id: str, message_id: str, feedback_type: str) -> Dict[str, Any]:
         """
@@ -203,133 +363,159 @@ class GenieClient:
             conversation_id: The conversation ID
             message_id: The message ID to provide feedback for
             feedback_type: Either "positive" or "negative"
-            
+
         Returns:
             API response
+
+        Raises:
+            ValueError: If feedback_type is not "positive" or "negative"
         """
-        self.update_headers()  # Refresh token before API call
-        url = f"{self.base_url}/conversations/{conversation_id}/messages/{message_id}/feedback"
-        
-        # Correct format: {"rating": "POSITIVE"} or {"rating": "NEGATIVE"}
-        rating_value = "POSITIVE" if feedback_type == "positive" else "NEGATIVE"
+        rating_value = self._RATINGS.get(feedback_type)
+        if rating_value is None:
+            raise ValueError(f"Invalid feedback_type {feedback_type!r}: expected 'positive' or 'negative'")
+
+        self.update_headers()  # No-op unless the cached token rotated
+        url = self._conversations_url + conversation_id + "/messages/" + message_id + "/feedback"
         payload = {"rating": rating_value}
-        
-        logger.info(f"Sending {feedback_type} feedback (rating={rating_value}) for message {message_id}")
-        logger.debug(f"Request URL: {url}")
-        logger.debug(f"Payload: {payload}")
+
+        logger.info("Sending %s feedback (rating=%s) for message %s", feedback_type, rating_value, message_id)
+        logger.debug("Request URL: %s", url)
+        logger.debug("Payload: %s", payload)
         
         try:
-            response = requests.post(url, headers=self.headers, json=payload)
-            response.raise_for_status()
+            response = self.client.post(url, content=orjson.dumps(payload))
+            self._check_response(response)
             logger.info(f"Feedback sent successfully: {response.status_code}")
-            return response.json() if response.text else {}
-        except requests.exceptions.HTTPError as e:
+            return orjson.loads(response.content) if response.content else {}
+        except httpx.HTTPStatusError as e:
             # Log the actual error response to help debug
             logger.error(f"HTTP Error: {e}")
             if hasattr(e.response, 'text'):
                 logger.error(f"Response body: {e.response.text}")
             raise
 
-    def wait_for_message_completion(self, conversation_id: str, message_id: str, timeout: int = 300, poll_interval: int = 2) -> Dict[str, Any]:
+    def wait_for_message_completion(self, conversation_id: str, message_id: str, timeout: int = 300, initial_poll: float = 1.0, max_poll: float = 8.0) -> Dict[str, Any]:
         """
         Wait for a message to reach a terminal state (COMPLETED, ERROR, etc.).
-        
+
+        Polls with an exponentially increasing, jittered interval so fast
+        completions are picked up quickly while long-running queries don't
+        get hammered with a request every couple of seconds.
+
         Args:
             conversation_id: The ID of the conversation
             message_id: The ID of the message
             timeout: Maximum time to wait in seconds
-            poll_interval: Time between status checks in seconds
-            
+            initial_poll: Starting interval between status checks in seconds
+            max_poll: Upper bound on the interval between status checks in seconds
+
         Returns:
             The completed message
         """
-        
+
         start_time = time.time()
-        attempt = 1
-        
+        interval = initial_poll
+
         while time.time() - start_time < timeout:
-            
+
             message = self.get_message(conversation_id, message_id)
             status = message.get("status")
-            
+
             if status in ["COMPLETED", "ERROR", "FAILED"]:
                 return message
-                
-            time.sleep(poll_interval)
-            attempt += 1
-            
+
+            time.sleep(interval + random.uniform(0, interval * 0.2))
+            interval = min(interval * 1.5, max_poll)
+
         raise TimeoutError(f"Message processing timed out after {timeout} seconds")
 
-def start_new_conversation(question: str) -> Tuple[str, Union[str, pd.DataFrame], Optional[str], List[str]]:
+# Shared client so all helpers reuse the same pooled session instead of
+# paying a new TCP+TLS handshake per call
+@functools.lru_cache(maxsize=1)
+def _get_client() -> GenieClient:
+    """Get the shared GenieClient instance, creating it on first use"""
+    config = _get_config()
+    return GenieClient(
+        host=config["host"],
+        space_id=config["space_id"]
+    )
+
+def _resolve_bot_message(client: GenieClient, conversation_id: str, user_message_id: str, default: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Find the bot's reply via the list endpoint when the completed message
+    came back empty.
+
+    Args:
+        client: The GenieClient instance
+        conversation_id: The conversation ID
+        user_message_id: The ID of the user message that was sent
+        default: Message to return when the conversation has no messages
+
+    Returns:
+        The bot message that follows the user message, or the last message
+        in the conversation, or `default`
+    """
+    logger.info(f"Completed message is empty, fetching full details from list endpoint")
+    messages_response = client.list_conversation_messages(conversation_id)
+    messages = messages_response.get("messages", [])
+    logger.debug("Found %d messages in conversation", len(messages))
+
+    if not messages:
+        return default
+
+    # Index by ID once instead of a linear scan per lookup
+    index_by_id = {msg.get("message_id"): i for i, msg in enumerate(messages)}
+
+    i = index_by_id.get(user_message_id)
+    if i is not None and i + 1 < len(messages):
+        # The bot's response directly follows our user message
+        return messages[i + 1]
+
+    # Fallback: use the last message (should be bot's response)
+    return messages[-1]
+
+def start_new_conversation(question: str) -> Tuple[str, Union[str, pd.DataFrame], Optional[str], List[str], Optional[str]]:
     """
     Start a new conversation with Genie.
-    
+
     Args:
         question: The initial question
-        
+
     Returns:
         Tuple containing:
         - conversation_id: The new conversation ID
         - response: Either text or DataFrame response
         - query_text: SQL query text if applicable, otherwise None
         - suggested_questions: List of suggested follow-up questions
+        - message_id: The ID of the processed message (for feedback)
     """
-    
-    client = GenieClient(
-        host=DATABRICKS_HOST,
-        space_id=SPACE_ID
-    )
-    
+
+    client = _get_client()
+
     try:
         # Start a new conversation
         response = client.start_conversation(question)
         conversation_id = response.get("conversation_id")
         message_id = response.get("message_id")
-        
+
         # Wait for the message to complete
         complete_message = client.wait_for_message_completion(conversation_id, message_id)
-        
-        # Fetch full message details including suggested_questions using list endpoint
-        logger.info(f"Fetching full message details with suggested_questions")
-        messages_response = client.list_conversation_messages(conversation_id)
-        
-        # Find the BOT's response message (not the user's message)
-        # The message_id from start_conversation is the USER's message
-        # We need to find the bot's response message which contains suggested_questions
-        full_message = complete_message  # Default to what we have
-        messages = messages_response.get("messages", [])
-        logger.info(f"Found {len(messages)} messages in conversation")
-        
-        # Messages are typically ordered chronologically, so find the bot's response
-        # after our user message
-        bot_response_message = None
-        for i, msg in enumerate(messages):
-            logger.info(f"Message {i}: ID={msg.get('message_id')}, Role={msg.get('role', 'unknown')}")
-            
-            # Find our user message
-            if msg.get("message_id") == message_id:
-                logger.info(f"Found user message at index {i}")
-                # Get the next message (bot's response)
-                if i + 1 < len(messages):
-                    bot_response_message = messages[i + 1]
-                    logger.info(f"Found bot response at index {i+1}: {bot_response_message.get('message_id')}")
-                break
-        
-        # Use bot's response if found, otherwise use the last message (most recent)
-        if bot_response_message:
-            full_message = bot_response_message
-        elif messages:
-            # Fallback: use the last message (should be bot's response)
-            full_message = messages[-1]
-            logger.info(f"Using last message in conversation: {full_message.get('message_id')}")
-        
+
+        # The completed message already carries the bot's attachments and
+        # suggested_questions, so use it directly. Only fall back to the
+        # list endpoint when it came back with neither.
+        full_message = complete_message
+        if not complete_message.get("attachments") and not complete_message.get("content"):
+            full_message = _resolve_bot_message(client, conversation_id, message_id, complete_message)
+
         # Process the response
         result, query_text, suggested_questions = process_genie_response(client, conversation_id, message_id, full_message)
-        
-        return conversation_id, result, query_text, suggested_questions
-        
+
+        bot_message_id = full_message.get("message_id") or full_message.get("id") or message_id
+        return conversation_id, result, query_text, suggested_questions, bot_message_id
+
     except Exception as e:
-        return None, f"Sorry, an error occurred: {str(e)}. Please try again.", None, []
+        return None, f"Sorry, an error occurred: {str(e)}. Please try again.", None, [], None
 
 def continue_conversation(conversation_id: str, question: str) -> Tuple[Union[str, pd.DataFrame], Optional[str], List[str]]:
     """
@@ -347,53 +533,23 @@ def continue_conversation(conversation_id: str, question: str) -> Tuple[Union[st
     """
     logger.info(f"Continuing conversation {conversation_id} with question: {question[:30]}...")
     
-    client = GenieClient(
-        host=DATABRICKS_HOST,
-        space_id=SPACE_ID
-    )
+    client = _get_client()
     
     try:
         # Send follow-up message in existing conversation
         response = client.send_message(conversation_id, question)
         message_id = response.get("message_id")
-        
+
         # Wait for the message to complete
         complete_message = client.wait_for_message_completion(conversation_id, message_id)
-        
-        # Fetch full message details including suggested_questions using list endpoint
-        logger.info(f"Fetching full message details with suggested_questions")
-        messages_response = client.list_conversation_messages(conversation_id)
-        
-        # Find the BOT's response message (not the user's message)
-        # The message_id from send_message is the USER's message
-        # We need to find the bot's response message which contains suggested_questions
-        full_message = complete_message  # Default to what we have
-        messages = messages_response.get("messages", [])
-        logger.info(f"Found {len(messages)} messages in conversation")
-        
-        # Messages are typically ordered chronologically, so find the bot's response
-        # after our user message
-        bot_response_message = None
-        for i, msg in enumerate(messages):
-            logger.info(f"Message {i}: ID={msg.get('message_id')}, Role={msg.get('role', 'unknown')}")
-            
-            # Find our user message
-            if msg.get("message_id") == message_id:
-                logger.info(f"Found user message at index {i}")
-                # Get the next message (bot's response)
-                if i + 1 < len(messages):
-                    bot_response_message = messages[i + 1]
-                    logger.info(f"Found bot response at index {i+1}: {bot_response_message.get('message_id')}")
-                break
-        
-        # Use bot's response if found, otherwise use the last message (most recent)
-        if bot_response_message:
-            full_message = bot_response_message
-        elif messages:
-            # Fallback: use the last message (should be bot's response)
-            full_message = messages[-1]
-            logger.info(f"Using last message in conversation: {full_message.get('message_id')}")
-        
+
+        # The completed message already carries the bot's attachments and
+        # suggested_questions, so use it directly. Only fall back to the
+        # list endpoint when it came back with neither.
+        full_message = complete_message
+        if not complete_message.get("attachments") and not complete_message.get("content"):
+            full_message = _resolve_bot_message(client, conversation_id, message_id, complete_message)
+
         # Process the response
         result, query_text, suggested_questions = process_genie_response(client, conversation_id, message_id, full_message)
         
@@ -409,6 +565,57 @@ def continue_conversation(conversation_id: str, question: str) -> Tuple[Union[st
             logger.error(f"Error continuing conversation: {str(e)}")
             return f"Sorry, an error occurred: {str(e)}", None, []
 
+# Databricks SQL type_name hints mapped to pandas conversions for typed columns
+_NUMERIC_TYPE_NAMES = {"BYTE", "SHORT", "INT", "LONG", "FLOAT", "DOUBLE", "DECIMAL"}
+_DATETIME_TYPE_NAMES = {"DATE", "TIMESTAMP", "TIMESTAMP_NTZ"}
+_BOOLEAN_VALUES = {"true": True, "false": False, True: True, False: False}
+
+def _build_dataframe(data_array: List[List[Any]], schema: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Build a DataFrame column-by-column from a row-oriented data_array.
+
+    The Genie API returns rows as lists of strings, so handing them straight
+    to pd.DataFrame forces row-by-row dtype inference. Transposing to
+    per-column sequences first and converting each with the schema's
+    type_name hint skips that inference entirely.
+    """
+    schema_columns = schema.get('columns', [])
+    columns = [col.get('name') for col in schema_columns]
+
+    # If no columns from schema, create generic ones
+    if not columns and data_array and len(data_array) > 0:
+        columns = [f"column_{i}" for i in range(len(data_array[0]))]
+        schema_columns = [{} for _ in columns]
+
+    raw_columns = list(zip(*data_array)) if data_array else [() for _ in columns]
+
+    typed_columns = []
+    names = []
+    for name, col_schema, values in zip(columns, schema_columns, raw_columns):
+        series = pd.Series(values, dtype=object)
+        type_name = (col_schema.get('type_name') or '').upper()
+        try:
+            if type_name in _NUMERIC_TYPE_NAMES:
+                series = pd.to_numeric(series)
+            elif type_name in _DATETIME_TYPE_NAMES:
+                series = pd.to_datetime(series)
+            elif type_name == "BOOLEAN":
+                # map() never raises - it turns unmapped values into NaN - so
+                # only convert when every non-null value is a known literal
+                if series.dropna().isin(tuple(_BOOLEAN_VALUES)).all():
+                    series = series.map(_BOOLEAN_VALUES)
+        except (ValueError, TypeError):
+            # Keep the raw values if the schema hint doesn't match the data
+            pass
+        typed_columns.append(series)
+        names.append(name)
+
+    # Assemble positionally so duplicate column names (e.g. a.id, b.id in a
+    # join) all survive; a name-keyed dict would silently drop all but one
+    frame = pd.DataFrame(dict(enumerate(typed_columns)), copy=False)
+    frame.columns = names
+    return frame
+
 def process_genie_response(client, conversation_id, message_id, complete_message) -> Tuple[Union[str, pd.DataFrame], Optional[str], List[str]]:
     """
     Process the response from Genie
@@ -429,59 +636,77 @@ def process_genie_response(client, conversation_id, message_id, complete_message
     result = None
     query_text = None
     
-    # Check attachments - FIRST pass: collect suggested questions from all attachments
+    # Single pass over attachments: collect suggested questions and pick the
+    # response content as we go
     attachments = complete_message.get("attachments", [])
     logger.info(f"Processing {len(attachments)} attachments")
-    
+
+    # When several attachments carry queries, prefetch their results in
+    # parallel - each fetch is independent I/O, so wall time becomes the
+    # slowest fetch instead of the sum
+    query_attachment_ids = [a.get("attachment_id") for a in attachments if "query" in a]
+    prefetched_results = {}
+    if len(query_attachment_ids) > 1:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            futures = {
+                executor.submit(client.get_query_result, conversation_id, message_id, attachment_id): attachment_id
+                for attachment_id in query_attachment_ids
+            }
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    prefetched_results[futures[future]] = future.result()
+                except Exception as e:
+                    logger.error(f"Error prefetching query result: {str(e)}")
+
     for idx, attachment in enumerate(attachments):
-        logger.info(f"Attachment {idx} keys: {list(attachment.keys())}")
-        
-        # Log the full attachment structure for debugging (without large content)
-        debug_attachment = {k: v for k, v in attachment.items() if k not in ['text', 'query']}
-        logger.info(f"Attachment {idx} structure: {json.dumps(debug_attachment, indent=2)}")
-        
+        # Only build the debug view of the attachment when it will actually be
+        # emitted - stripping and formatting it is wasted work otherwise
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Attachment %d keys: %s", idx, list(attachment.keys()))
+            debug_attachment = {k: v for k, v in attachment.items() if k not in ['text', 'query']}
+            logger.debug("Attachment %d structure: %s", idx, debug_attachment)
+
         # Extract suggested questions if present
         # According to https://docs.databricks.com/api/workspace/genie/listconversationmessages
         # Structure should be: attachment.suggested_questions.questions
         if "suggested_questions" in attachment:
             sq_data = attachment.get("suggested_questions")
-            logger.info(f"Found suggested_questions field! Type: {type(sq_data)}, Content: {sq_data}")
-            
+            logger.debug("Found suggested_questions field! Type: %s, Content: %s", type(sq_data), sq_data)
+
             if isinstance(sq_data, dict) and "questions" in sq_data:
-                suggested_questions = sq_data.get("questions", [])
-                logger.info(f"✓ Found {len(suggested_questions)} suggested questions from Genie: {suggested_questions}")
+                if not suggested_questions:
+                    suggested_questions = sq_data.get("questions", [])
+                    logger.info("✓ Found %d suggested questions from Genie", len(suggested_questions))
             else:
                 logger.warning(f"suggested_questions field exists but doesn't have expected structure: {sq_data}")
         else:
-            logger.info(f"✗ No suggested_questions field in attachment {idx}")
-    
-    # SECOND pass: process content from attachments
-    for attachment in attachments:
-        attachment_id = attachment.get("attachment_id")
-        
-        # If there's text content in the attachment, use it
-        if "text" in attachment and "content" in attachment["text"]:
-            result = attachment["text"]["content"]
-            query_text = None
+            logger.debug("✗ No suggested_questions field in attachment %d", idx)
+
+        if result is None:
+            attachment_id = attachment.get("attachment_id")
+
+            # If there's text content in the attachment, use it
+            if "text" in attachment and "content" in attachment["text"]:
+                result = attachment["text"]["content"]
+                query_text = None
+
+            # If there's a query, get the result
+            elif "query" in attachment:
+                query_text = attachment.get("query", {}).get("query", "")
+                query_result = prefetched_results.get(attachment_id)
+                if query_result is None:
+                    query_result = client.get_query_result(conversation_id, message_id, attachment_id)
+
+                data_array = query_result.get('data_array', [])
+                schema = query_result.get('schema', {})
+
+                # If we have data, return as DataFrame
+                if data_array:
+                    result = _build_dataframe(data_array, schema)
+
+        # Stop scanning once we have both the answer and its follow-ups
+        if result is not None and suggested_questions:
             break
-        
-        # If there's a query, get the result
-        elif "query" in attachment:
-            query_text = attachment.get("query", {}).get("query", "")
-            query_result = client.get_query_result(conversation_id, message_id, attachment_id)
-           
-            data_array = query_result.get('data_array', [])
-            schema = query_result.get('schema', {})
-            columns = [col.get('name') for col in schema.get('columns', [])]
-            
-            # If we have data, return as DataFrame
-            if data_array:
-                # If no columns from schema, create generic ones
-                if not columns and data_array and len(data_array) > 0:
-                    columns = [f"column_{i}" for i in range(len(data_array[0]))]
-                
-                result = pd.DataFrame(data_array, columns=columns)
-                break
     
     # If we found result in attachments, return it
     if result is not None:
@@ -496,104 +721,108 @@ def process_genie_response(client, conversation_id, message_id, complete_message
     logger.warning("No response available")
     return "No response available", None, []
 
+# Space metadata is effectively static per deployment, so the fetchers below
+# are answered from an in-process TTL cache between refreshes; paired with
+# the get_space_details cache, repeated calls become dict lookups. The
+# try/except lives in the public wrappers, not the cached fetchers:
+# cachetools doesn't cache raising calls, so a transient failure isn't
+# pinned as an empty result for the whole TTL
+@cachetools.cached(cachetools.TTLCache(maxsize=4, ttl=GenieClient.SPACE_CACHE_TTL))
+def _fetch_sample_questions() -> List[str]:
+    """Fetch and cache the space's sample questions, raising on API errors"""
+    client = _get_client()
+
+    space_details = client.get_space_details()
+    logger.info(f"Fetched space details from Genie Space")
+
+    # Extract sample questions from the pre-parsed serialized_space object
+    # https://docs.databricks.com/api/workspace/genie/getspace
+    space_config = space_details.get('serialized_space_obj')
+
+    if not space_config:
+        logger.warning("No serialized_space field found in response")
+        return []
+
+    # Navigate to config.sample_questions
+    sample_questions_data = space_config.get('config', {}).get('sample_questions', [])
+
+    # Extract question text from each sample question object
+    # Format: [{"id": "...", "question": ["Question text"]}, ...]
+    sample_questions = []
+    for item in sample_questions_data:
+        if isinstance(item, dict) and 'question' in item:
+            question = item['question']
+            # question is a list, take the first element
+            if isinstance(question, list) and len(question) > 0:
+                sample_questions.append(question[0])
+            elif isinstance(question, str):
+                sample_questions.append(question)
+
+    logger.info(f"Retrieved {len(sample_questions)} sample questions from Genie Space")
+    return sample_questions if sample_questions else []
+
 def get_sample_questions() -> List[str]:
     """
     Fetch sample questions from the Genie Space.
-    
+
+    Successful results are cached in-process for SPACE_CACHE_TTL seconds;
+    failures are not cached, so the next call retries.
+
     Returns:
         List of sample questions configured in the space
     """
     try:
-        client = GenieClient(
-            host=DATABRICKS_HOST,
-            space_id=SPACE_ID
-        )
-        
-        space_details = client.get_space_details()
-        logger.info(f"Fetched space details from Genie Space")
-        
-        # Extract sample questions from serialized_space field according to Databricks API docs
-        # https://docs.databricks.com/api/workspace/genie/getspace
-        serialized_space = space_details.get('serialized_space')
-        
-        if not serialized_space:
-            logger.warning("No serialized_space field found in response")
-            return []
-        
-        # Parse the JSON string
-        space_config = json.loads(serialized_space)
-        
-        # Navigate to config.sample_questions
-        sample_questions_data = space_config.get('config', {}).get('sample_questions', [])
-        
-        # Extract question text from each sample question object
-        # Format: [{"id": "...", "question": ["Question text"]}, ...]
-        sample_questions = []
-        for item in sample_questions_data:
-            if isinstance(item, dict) and 'question' in item:
-                question = item['question']
-                # question is a list, take the first element
-                if isinstance(question, list) and len(question) > 0:
-                    sample_questions.append(question[0])
-                elif isinstance(question, str):
-                    sample_questions.append(question)
-        
-        logger.info(f"Retrieved {len(sample_questions)} sample questions from Genie Space")
-        return sample_questions if sample_questions else []
-        
-    except json.JSONDecodeError as e:
-        logger.error(f"Error parsing serialized_space JSON: {str(e)}")
-        return []
+        return _fetch_sample_questions()
     except Exception as e:
         logger.error(f"Error fetching sample questions: {str(e)}")
         return []
 
+@cachetools.cached(cachetools.TTLCache(maxsize=4, ttl=GenieClient.SPACE_CACHE_TTL))
+def _fetch_space_info() -> Tuple[Optional[str], Optional[str]]:
+    """Fetch and cache the space title and description, raising on API errors"""
+    client = _get_client()
+
+    space_details = client.get_space_details()
+    logger.info(f"Fetched space details from Genie Space")
+
+    # Log the full response for debugging (but not sensitive data)
+    logger.info(f"Space details keys: {list(space_details.keys())}")
+
+    # Extract title and description from the top-level response
+    # According to the API docs, these should be at the root level
+    space_title = space_details.get('title')
+    space_description = space_details.get('description')
+
+    # Fallback: try display_name or name if title is not present
+    if not space_title:
+        space_title = space_details.get('display_name') or space_details.get('name')
+        logger.info(f"Title not found, using fallback: '{space_title}'")
+
+    # Fallback: try to extract description from serialized_space if not at top level
+    if not space_description:
+        space_config = space_details.get('serialized_space_obj')
+        if space_config:
+            space_description = space_config.get('config', {}).get('description')
+            logger.info(f"Description not at top level, extracted from serialized_space")
+
+    logger.info(f"Retrieved space title: '{space_title}', description: '{space_description}'")
+    return space_title, space_description
+
 def get_space_info() -> Tuple[Optional[str], Optional[str]]:
     """
     Fetch the Genie Space title and description.
     According to https://docs.databricks.com/api/workspace/genie/getspace
-    
+
+    Successful results are cached in-process for SPACE_CACHE_TTL seconds;
+    failures are not cached, so the next call retries.
+
     Returns:
         Tuple containing:
         - space_title: The title of the space
         - space_description: The description of the space
     """
     try:
-        client = GenieClient(
-            host=DATABRICKS_HOST,
-            space_id=SPACE_ID
-        )
-        
-        space_details = client.get_space_details()
-        logger.info(f"Fetched space details from Genie Space")
-        
-        # Log the full response for debugging (but not sensitive data)
-        logger.info(f"Space details keys: {list(space_details.keys())}")
-        
-        # Extract title and description from the top-level response
-        # According to the API docs, these should be at the root level
-        space_title = space_details.get('title')
-        space_description = space_details.get('description')
-        
-        # Fallback: try display_name or name if title is not present
-        if not space_title:
-            space_title = space_details.get('display_name') or space_details.get('name')
-            logger.info(f"Title not found, using fallback: '{space_title}'")
-        
-        # Fallback: try to extract description from serialized_space if not at top level
-        if not space_description:
-            serialized_space = space_details.get('serialized_space')
-            if serialized_space:
-                try:
-                    space_config = json.loads(serialized_space)
-                    space_description = space_config.get('config', {}).get('description')
-                    logger.info(f"Description not at top level, extracted from serialized_space")
-                except json.JSONDecodeError as e:
-                    logger.error(f"Error parsing serialized_space JSON: {str(e)}")
-        
-        logger.info(f"Retrieved space title: '{space_title}', description: '{space_description}'")
-        return space_title, space_description
-        
+        return _fetch_space_info()
     except Exception as e:
         logger.error(f"Error fetching space info: {str(e)}")
         return None, None
@@ -611,10 +840,7 @@ def send_feedback(conversation_id: str, message_id: str, feedback_type: str) ->
         True if successful, False otherwise
     """
     try:
-        client = GenieClient(
-            host=DATABRICKS_HOST,
-            space_id=SPACE_ID
-        )
+        client = _get_client()
         
         logger.info(f"Attempting to send {feedback_type} feedback...")
         logger.info(f"  Conversation ID: {conversation_id}")
@@ -625,7 +851,7 @@ def send_feedback(conversation_id: str, message_id: str, feedback_type: str) ->
         logger.debug(f"API response: {result}")
         return True
         
-    except requests.exceptions.HTTPError as e:
+    except httpx.HTTPStatusError as e:
         status_code = e.response.status_code if hasattr(e, 'response') else 'unknown'
         logger.error(f"✗ HTTP Error {status_code} sending feedback: {str(e)}")
         
@@ -662,29 +888,12 @@ def genie_query(question: str) -> Tuple[Union[str, pd.DataFrame], Optional[str],
         - message_id: The message ID (for feedback)
     """
     try:
-        # Start a new conversation for each query
-        conversation_id, result, query_text, suggested_questions = start_new_conversation(question)
-        
-        # Get the bot's message ID from the conversation
-        # We need to fetch the latest message to get the bot's response message_id
-        client = GenieClient(
-            host=DATABRICKS_HOST,
-            space_id=SPACE_ID
-        )
-        messages_response = client.list_conversation_messages(conversation_id)
-        messages = messages_response.get("messages", [])
-        
-        # Get the last message (bot's response)
-        bot_message_id = None
-        if messages:
-            # Find the bot's response message (not the user's message)
-            for msg in reversed(messages):
-                if msg.get("role") != "USER":
-                    bot_message_id = msg.get("message_id")
-                    break
-        
+        # Start a new conversation for each query; it already returns the
+        # processed message ID, so no extra list call is needed here
+        conversation_id, result, query_text, suggested_questions, bot_message_id = start_new_conversation(question)
+
         return result, query_text, suggested_questions, conversation_id, bot_message_id
-            
+
     except Exception as e:
         logger.error(f"Error in conversation: {str(e)}. Please try again.")
         return f"Sorry, an error occurred: {str(e)}. Please try again.", None, [], None, None
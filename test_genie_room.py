@@ -0,0 +1,86 @@
+import httpx
+import orjson
+import pytest
+
+import genie_room
+from genie_room import GenieClient
+
+
+class _StubTokenMinter:
+    """Stands in for TokenMinter so tests never touch the network"""
+    def get_token(self) -> str:
+        return "test-token"
+
+    def invalidate(self) -> None:
+        pass
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(genie_room, "_get_token_minter", lambda: _StubTokenMinter())
+    return GenieClient(host="example.test", space_id="space-1")
+
+
+def _mount_transport(client: GenieClient, handler) -> None:
+    """Point the client's pooled httpx.Client at a mock transport"""
+    client.client = httpx.Client(
+        transport=httpx.MockTransport(handler),
+        headers=client.client.headers
+    )
+
+
+def test_get_query_result_streams_rows_and_schema(client):
+    # Regression test: the streamed body must reach ijson through a
+    # file-like source, not a raw chunk iterator
+    payload = {
+        "statement_response": {
+            "manifest": {"schema": {"columns": [{"name": "n", "type_name": "LONG"}]}},
+            "result": {"data_array": [["1"], ["2"]]},
+        }
+    }
+
+    def handler(request):
+        return httpx.Response(200, content=orjson.dumps(payload))
+
+    _mount_transport(client, handler)
+    result = client.get_query_result("conv-1", "msg-1", "att-1")
+
+    assert result["data_array"] == [["1"], ["2"]]
+    assert result["schema"] == {"columns": [{"name": "n", "type_name": "LONG"}]}
+
+
+def test_get_query_result_handles_missing_statement_response(client):
+    def handler(request):
+        return httpx.Response(200, content=orjson.dumps({}))
+
+    _mount_transport(client, handler)
+    result = client.get_query_result("conv-1", "msg-1", "att-1")
+
+    assert result == {"data_array": [], "schema": {}}
+
+
+def test_build_dataframe_keeps_duplicate_column_names():
+    # Joins can yield duplicate names (a.id, b.id); both columns must survive
+    schema = {"columns": [{"name": "id", "type_name": "LONG"},
+                          {"name": "id", "type_name": "STRING"}]}
+    df = genie_room._build_dataframe([["1", "x"], ["2", "y"]], schema)
+
+    assert list(df.columns) == ["id", "id"]
+    assert df.shape == (2, 2)
+    assert list(df.iloc[:, 1]) == ["x", "y"]
+
+
+def test_build_dataframe_keeps_raw_values_on_boolean_mismatch():
+    # "True" isn't a known literal, so the whole column stays untouched
+    # instead of being partially mapped to NaN
+    schema = {"columns": [{"name": "flag", "type_name": "BOOLEAN"}]}
+    df = genie_room._build_dataframe([["True"], ["false"], [None]], schema)
+
+    assert list(df["flag"]) == ["True", "false", None]
+
+
+def test_build_dataframe_converts_clean_boolean_column():
+    schema = {"columns": [{"name": "flag", "type_name": "BOOLEAN"}]}
+    df = genie_room._build_dataframe([["true"], ["false"]], schema)
+
+    assert list(df["flag"]) == [True, False]
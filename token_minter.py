@@ -1,6 +1,6 @@
 import requests
 import threading
-from datetime import datetime, timedelta
+import time
 import logging
 import os
 from dotenv import load_dotenv
@@ -35,23 +35,30 @@ class TokenMinter:
             
             with self.lock:
                 self.token = token_data.get('access_token')
-                # Set expiry time to 55 minutes (slightly less than the 60-minute expiry)
-                self.expiry_time = datetime.now() + timedelta(minutes=55)
+                # Set expiry time to 55 minutes (slightly less than the 60-minute expiry);
+                # monotonic clock so wall-clock adjustments can't skew the deadline
+                self.expiry_time = time.monotonic() + 55 * 60
                 
             logger.info("Successfully refreshed Databricks OAuth token")
         except Exception as e:
             logger.error(f"Failed to refresh Databricks OAuth token: {str(e)}")
             raise
     
+    def invalidate(self) -> None:
+        """Drop the cached token so the next get_token() mints a fresh one"""
+        with self.lock:
+            self.token = None
+            self.expiry_time = None
+
     def get_token(self) -> str:
         """
         Get a valid token, refreshing if necessary.
-        
+
         Returns:
             str: The current valid OAuth token
         """
         with self.lock:
-            # Check if token is expired or about to expire (within 5 minutes)
-            if not self.token or not self.expiry_time or datetime.now() + timedelta(minutes=5) >= self.expiry_time:
+            # Check if token is expired or about to expire (within 60 seconds)
+            if not self.token or not self.expiry_time or time.monotonic() >= self.expiry_time - 60:
                 self._refresh_token()
             return self.token